@@ -2,149 +2,228 @@ import streamlit as st
 import pandas as pd
 import io
 import re
-from difflib import SequenceMatcher
+import hashlib
+import functools
 import string
+import numpy as np
+from rapidfuzz import fuzz, process
+from types import SimpleNamespace
 
-# Optional imports with fallbacks
-try:
-    from docx import Document
-    DOCX_AVAILABLE = True
-except ImportError:
-    DOCX_AVAILABLE = False
-    st.warning("⚠️ python-docx not installed. Word document support disabled.")
+# Optional imports with fallbacks, probed once per server process
+@st.cache_resource
+def _load_optional_modules():
+    modules = SimpleNamespace()
+    try:
+        from docx import Document
+        modules.Document = Document
+    except ImportError:
+        modules.Document = None
 
-try:
-    import fitz  # PyMuPDF
-    PDF_AVAILABLE = True
-except ImportError:
-    PDF_AVAILABLE = False
-    st.warning("⚠️ PyMuPDF not installed. PDF support disabled.")
+    try:
+        import fitz  # PyMuPDF
+        modules.fitz = fitz
+    except ImportError:
+        modules.fitz = None
 
-try:
-    import nltk
-    from nltk.tokenize import word_tokenize
-    from nltk.corpus import stopwords
-    NLTK_AVAILABLE = True
-    
-    # Download required NLTK data if available
     try:
-        nltk.data.find('tokenizers/punkt')
-        nltk.data.find('corpora/stopwords')
-    except LookupError:
-        with st.spinner("Downloading language resources..."):
-            nltk.download('punkt', quiet=True)
-            nltk.download('stopwords', quiet=True)
-except ImportError:
-    NLTK_AVAILABLE = False
+        import nltk
+        from nltk.corpus import stopwords
+        modules.nltk, modules.stopwords = nltk, stopwords
+    except ImportError:
+        modules.nltk = modules.stopwords = None
+
+    try:
+        from sklearn.feature_extraction.text import HashingVectorizer
+        modules.HashingVectorizer = HashingVectorizer
+    except ImportError:
+        modules.HashingVectorizer = None
+
+    try:
+        import xlsxwriter
+        modules.xlsxwriter = xlsxwriter
+    except ImportError:
+        modules.xlsxwriter = None
+
+    return modules
+
+_modules = _load_optional_modules()
+Document = _modules.Document
+fitz = _modules.fitz
+nltk, stopwords = _modules.nltk, _modules.stopwords
+HashingVectorizer = _modules.HashingVectorizer
+xlsxwriter = _modules.xlsxwriter
+
+DOCX_AVAILABLE = Document is not None
+PDF_AVAILABLE = fitz is not None
+NLTK_AVAILABLE = nltk is not None
+SKLEARN_AVAILABLE = HashingVectorizer is not None
+XLSX_AVAILABLE = xlsxwriter is not None
 
 # Set page config
 st.set_page_config(page_title="AI Grader Assistant", layout="wide")
 
 st.title("📚 AI Teacher's Grading Assistant (Simple Version)")
 
-# Helper: extract text from DOCX
-def extract_text_docx(file):
-    if not DOCX_AVAILABLE:
-        st.error("DOCX support not available. Please install python-docx.")
-        return ""
+# Cached parsers keyed on the raw upload bytes, so reruns skip re-parsing
+# (shared by all sessions, so bounded in size and lifetime)
+@st.cache_data(show_spinner=False, max_entries=32, ttl=3600)
+def _extract_docx_bytes(data: bytes) -> str:
     try:
-        doc = Document(file)
+        doc = Document(io.BytesIO(data))
         return "\n".join([para.text for para in doc.paragraphs])
     except Exception as e:
         st.error(f"Error reading DOCX file: {str(e)}")
         return ""
 
-# Helper: extract text from PDF
-def extract_text_pdf(file):
-    if not PDF_AVAILABLE:
-        st.error("PDF support not available. Please install PyMuPDF.")
-        return ""
+@st.cache_data(show_spinner=False, max_entries=32, ttl=3600)
+def _extract_pdf_bytes(data: bytes) -> str:
     try:
-        file.seek(0)
-        pdf = fitz.open(stream=file.read(), filetype="pdf")
-        text = ""
-        for page in pdf:
-            text += page.get_text()
+        pdf = fitz.open(stream=data, filetype="pdf")
+        text = "".join(page.get_text("text", sort=False) for page in pdf)
         pdf.close()
         return text
     except Exception as e:
         st.error(f"Error reading PDF file: {str(e)}")
         return ""
 
-# Simple text similarity function
-def calculate_similarity(text1, text2):
-    """Calculate similarity between two texts"""
-    # Method 1: Character-based similarity
-    char_similarity = SequenceMatcher(None, text1.lower(), text2.lower()).ratio()
-    
-    # Method 2: Simple word-based similarity
-    def simple_clean_text(text):
-        # Remove punctuation and convert to lowercase
-        text = text.lower().translate(str.maketrans('', '', string.punctuation))
-        # Split into words and remove short words
-        words = [word for word in text.split() if len(word) > 2]
-        return set(words)
-    
-    if NLTK_AVAILABLE:
-        try:
-            stop_words = set(stopwords.words('english'))
-            
-            def clean_text(text):
-                text = text.lower().translate(str.maketrans('', '', string.punctuation))
-                tokens = word_tokenize(text)
-                return set([word for word in tokens if word not in stop_words and len(word) > 2])
-        except:
-            clean_text = simple_clean_text
-    else:
-        clean_text = simple_clean_text
-    
-    words1 = clean_text(text1)
-    words2 = clean_text(text2)
-    
+# Helper: extract text from DOCX bytes
+def extract_text_docx(data):
+    if not DOCX_AVAILABLE:
+        st.error("DOCX support not available. Please install python-docx.")
+        return ""
+    return _extract_docx_bytes(data)
+
+# Helper: extract text from PDF bytes
+def extract_text_pdf(data):
+    if not PDF_AVAILABLE:
+        st.error("PDF support not available. Please install PyMuPDF.")
+        return ""
+    return _extract_pdf_bytes(data)
+
+# Helper: extract text from an upload's bytes based on its file type
+def extract_text(file_name, data):
+    file_name = file_name.lower()
+    if file_name.endswith(".txt"):
+        return str(data, "utf-8")
+    elif file_name.endswith(".docx"):
+        return extract_text_docx(data)
+    elif file_name.endswith(".pdf"):
+        return extract_text_pdf(data)
+    return None
+
+# Word tokenizer, compiled once rather than per comparison: ASCII punctuation is
+# deleted, then any whitespace-separated run of 3+ characters is a word, so
+# non-Latin scripts, accents and contractions ("it's" -> "its") are kept
+_PUNCTUATION_TABLE = str.maketrans('', '', string.punctuation)
+_WORD_RE = re.compile(r"\S{3,}")
+
+# Stopword list, checked (and downloaded if missing) once per server process.
+# A failed download raises LookupError, which st.cache_resource does not cache,
+# so the next rerun tries again instead of grading without stopwords for good
+@st.cache_resource(show_spinner="Downloading language resources...")
+def _load_stopwords():
+    try:
+        nltk.data.find('corpora/stopwords')
+    except LookupError:
+        nltk.download('stopwords', quiet=True)
+    return frozenset(stopwords.words('english'))
+
+try:
+    _STOPWORDS = _load_stopwords() if NLTK_AVAILABLE else frozenset()
+except LookupError:
+    _STOPWORDS = frozenset()
+
+# Helper: lowercased text and its word set, built once per distinct text
+@functools.lru_cache(maxsize=2048)
+def _prepare(text):
+    lower_text = text.lower()
+    words = frozenset(_WORD_RE.findall(lower_text.translate(_PUNCTUATION_TABLE))) - _STOPWORDS
+    return lower_text, words
+
+def _clean_text(text):
+    """Lowercased words of 3+ characters, minus stopwords"""
+    return _prepare(text)[1]
+
+# process.cpdist arrived in rapidfuzz 3.6; older installs score pair by pair
+_HAS_CPDIST = hasattr(process, "cpdist")
+
+# Character-level similarity for aligned pairs, spread across CPU cores
+# (rapidfuzz is required so every install grades with the same fuzz.ratio metric)
+def _batch_char_similarity(student_list, correct_list):
+    if not _HAS_CPDIST:
+        return np.array([
+            fuzz.ratio(s, c, processor=str.lower) for s, c in zip(student_list, correct_list)
+        ]) / 100.0
+    # Native scorer runs without the GIL, so worker threads use every core
+    scores = process.cpdist(
+        student_list, correct_list, scorer=fuzz.ratio, processor=str.lower,
+        dtype=np.float64, workers=-1
+    )
+    return scores / 100.0
+
+# Jaccard overlap of two word sets
+def _word_similarity(words1, words2):
     if len(words1) == 0 or len(words2) == 0:
-        word_similarity = 0
-    else:
-        intersection = len(words1.intersection(words2))
-        union = len(words1.union(words2))
-        word_similarity = intersection / union if union > 0 else 0
-    
-    # Combine both methods
-    final_similarity = (char_similarity * 0.4) + (word_similarity * 0.6)
-    return final_similarity
+        return 0
+    intersection = len(words1 & words2)
+    # |A ∪ B| = |A| + |B| - |A ∩ B|, so the union set is never built
+    union = len(words1) + len(words2) - intersection
+    return intersection / union if union > 0 else 0
 
-# Smart grading function
-def grade_answer_local(student_answer, correct_answer, question_number):
-    """Grade answer using local algorithms"""
-    
-    # Calculate similarity
-    similarity = calculate_similarity(student_answer, correct_answer)
+# Below this many pairs the vectorizer's setup costs more than it saves
+_VECTORIZE_MIN_PAIRS = 200
+
+# Batch similarity: character plus word overlap for every aligned pair at once
+def batch_similarity(student_list, correct_list):
+    """Similarity of each aligned (student, correct) answer pair"""
+    char_similarity = _batch_char_similarity(student_list, correct_list)
     
-    # Determine score based on similarity
-    if similarity >= 0.8:
-        score = 9 + (similarity - 0.8) * 5
-        grade_level = "Excellent"
-    elif similarity >= 0.6:
-        score = 7 + (similarity - 0.6) * 10
-        grade_level = "Good"
-    elif similarity >= 0.4:
-        score = 5 + (similarity - 0.4) * 10
-        grade_level = "Fair"
-    elif similarity >= 0.2:
-        score = 3 + (similarity - 0.2) * 10
-        grade_level = "Poor"
+    if not SKLEARN_AVAILABLE or len(student_list) < _VECTORIZE_MIN_PAIRS:
+        # Each distinct answer key is tokenised once, up front
+        correct_words = [_clean_text(c) for c in correct_list]
+        word_similarity = np.array([
+            _word_similarity(_clean_text(s), words)
+            for s, words in zip(student_list, correct_words)
+        ])
     else:
-        score = similarity * 15
-        grade_level = "Very Poor"
+        # Binary bag-of-words over the same tokens as _clean_text
+        vectorizer = HashingVectorizer(
+            analyzer=_clean_text, n_features=2**18, binary=True, norm=None, alternate_sign=False
+        )
+        n = len(student_list)
+        matrix = vectorizer.transform(list(student_list) + list(correct_list))
+        student_matrix, correct_matrix = matrix[:n], matrix[n:]
+        
+        intersection = np.asarray(student_matrix.multiply(correct_matrix).sum(axis=1)).ravel()
+        union = (np.asarray(student_matrix.sum(axis=1)).ravel()
+                 + np.asarray(correct_matrix.sum(axis=1)).ravel() - intersection)
+        word_similarity = np.divide(intersection, union, out=np.zeros(n), where=union > 0)
     
+    return (char_similarity * 0.4) + (word_similarity * 0.6)
+
+# Score bands as (lower similarity bound, base score, points per unit, grade level)
+_SCORE_BANDS = [
+    (0.8, 9, 5, "Excellent"),
+    (0.6, 7, 10, "Good"),
+    (0.4, 5, 10, "Fair"),
+    (0.2, 3, 10, "Poor"),
+]
+
+def scores_from_similarity(similarities):
+    """Map an array of similarities to (scores, grade levels) in one pass"""
+    similarities = np.asarray(similarities, dtype=float)
+    conditions = [similarities >= bound for bound, _, _, _ in _SCORE_BANDS]
+    scores = np.select(
+        conditions,
+        [base + (similarities - bound) * slope for bound, base, slope, _ in _SCORE_BANDS],
+        default=similarities * 15
+    )
+    grade_levels = np.select(conditions, [level for _, _, _, level in _SCORE_BANDS], default="Very Poor")
     # Cap at 10
-    score = min(score, 10)
-    
-    # Length analysis
-    student_length = len(student_answer.split())
-    correct_length = len(correct_answer.split())
-    length_ratio = student_length / correct_length if correct_length > 0 else 0
-    
-    # Generate feedback
+    return np.minimum(scores, 10), grade_levels
+
+# Helper: feedback text for one graded answer
+def _build_feedback(score, grade_level, similarity, length_ratio):
     feedback_parts = []
     feedback_parts.append(f"**Score: {score:.1f}/10** ({grade_level})")
     feedback_parts.append(f"**Similarity to correct answer:** {similarity:.1%}")
@@ -166,19 +245,67 @@ def grade_answer_local(student_answer, correct_answer, question_number):
     
     return "\n\n".join(feedback_parts)
 
-# Answer parsing function
-def split_answers(text):
-    questions = {}
+# Batch grading function (repeat runs on the same answers are served from cache)
+@st.cache_data(show_spinner=False, max_entries=64, ttl=86400)
+def grade_answers_local(student_list, correct_list):
+    """Grade aligned lists of answers using local algorithms"""
+    similarities = batch_similarity(student_list, correct_list)
+    scores, grade_levels = scores_from_similarity(similarities)
+    
+    # Length analysis
+    student_lengths = np.array([len(answer.split()) for answer in student_list], dtype=float)
+    correct_lengths = np.array([len(answer.split()) for answer in correct_list], dtype=float)
+    length_ratios = np.divide(
+        student_lengths, correct_lengths,
+        out=np.zeros(len(student_list)), where=correct_lengths > 0
+    )
     
-    # Try multiple patterns for question detection
-    patterns = [
+    return [
+        {
+            # Rounded as displayed, so pass/fail matches the "Score: x.x/10" teachers see
+            "score": round(float(score), 1),
+            "grade_level": str(grade_level),
+            "similarity": float(similarity),
+            "feedback": _build_feedback(score, grade_level, similarity, length_ratio),
+        }
+        for score, grade_level, similarity, length_ratio
+        in zip(scores, grade_levels, similarities, length_ratios)
+    ]
+
+# Question detection patterns, tried in order (compiled once at import)
+_ANSWER_PATTERNS = [
+    re.compile(p, re.DOTALL | re.IGNORECASE)
+    for p in (
         r'Q(\d+):\s*(.*?)(?=Q\d+:|$)',
         r'Question\s+(\d+):\s*(.*?)(?=Question\s+\d+:|$)',
         r'(\d+)\.\s*(.*?)(?=\d+\.|$)',
-    ]
-    
+    )
+]
+
+# Helper: guess the question format from the opening of the text
+def _sniff_pattern(text):
+    head = text[:400].lower()
+    if "q1:" in head:
+        return _ANSWER_PATTERNS[0]
+    if "question 1" in head:
+        return _ANSWER_PATTERNS[1]
+    if head.lstrip().startswith("1."):
+        return _ANSWER_PATTERNS[2]
+    return None
+
+# Answer parsing function
+@st.cache_data(show_spinner=False, max_entries=64, ttl=3600)
+def split_answers(text):
+    questions = {}
+
+    # Try the sniffed format first; the others only if it finds nothing
+    sniffed = _sniff_pattern(text)
+    patterns = _ANSWER_PATTERNS
+    if sniffed is not None:
+        patterns = [sniffed] + [p for p in _ANSWER_PATTERNS if p is not sniffed]
+
     for pattern in patterns:
-        matches = re.findall(pattern, text, re.DOTALL | re.IGNORECASE)
+        matches = pattern.findall(text)
         if matches:
             for q_num, answer in matches:
                 questions[q_num.strip()] = answer.strip()
@@ -186,10 +313,49 @@ def split_answers(text):
     
     return questions
 
+# Helper: build CSV report, encoded in chunks straight into a byte buffer
+def build_csv_report(df):
+    output = io.BytesIO()
+    df.to_csv(output, index=False, encoding="utf-8", chunksize=100)
+    output.seek(0)
+    return output
+
+# Helper: build Excel report, streaming rows so memory stays flat
+def build_excel_report(df):
+    output = io.BytesIO()
+    # constant_memory flushes each row as it is written, so rows must go in order
+    # Answers are untrusted text: never turn them into live formulas or links
+    workbook = xlsxwriter.Workbook(output, {
+        "constant_memory": True,
+        "strings_to_formulas": False,
+        "strings_to_urls": False,
+    })
+    worksheet = workbook.add_worksheet("Grades")
+    worksheet.write_row(0, 0, list(df.columns))
+    for row_idx, row in enumerate(df.itertuples(index=False), start=1):
+        worksheet.write_row(row_idx, 0, row)
+    workbook.close()
+    output.seek(0)
+    return output
+
+# Helper: fingerprint of the raw inputs, to tell when they have changed
+def _input_key(*parts):
+    digest = hashlib.md5()
+    for part in parts:
+        digest.update(part)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
 # Sidebar
 st.sidebar.header("📤 Upload Files")
 st.sidebar.info("🎯 **No API Key Required!** This version uses local algorithms.")
 
+# Missing optional features
+if not DOCX_AVAILABLE:
+    st.sidebar.warning("⚠️ python-docx not installed. Word document support disabled.")
+if not PDF_AVAILABLE:
+    st.sidebar.warning("⚠️ PyMuPDF not installed. PDF support disabled.")
+
 # Determine available file types
 available_types = ["txt"]
 if DOCX_AVAILABLE:
@@ -229,47 +395,54 @@ process_ready = False
 
 if use_text_input:
     if student_text_input and answer_key_input:
+        input_key = _input_key(student_text_input.encode(), answer_key_input.encode())
         student_text = student_text_input
         answer_key_text = answer_key_input
         process_ready = True
 elif student_file and answer_key_file:
-    with st.spinner("Processing uploaded files..."):
-        # Extract text based on file type
-        if student_file.name.endswith(".txt"):
-            student_text = str(student_file.read(), "utf-8")
-        elif student_file.name.endswith(".docx"):
-            student_text = extract_text_docx(student_file)
-        elif student_file.name.endswith(".pdf"):
-            student_text = extract_text_pdf(student_file)
-        else:
-            st.error("Unsupported file type")
-            st.stop()
-            
-        if answer_key_file.name.endswith(".txt"):
-            answer_key_text = str(answer_key_file.read(), "utf-8")
-        elif answer_key_file.name.endswith(".docx"):
-            answer_key_text = extract_text_docx(answer_key_file)
-        elif answer_key_file.name.endswith(".pdf"):
-            answer_key_text = extract_text_pdf(answer_key_file)
-        else:
-            st.error("Unsupported file type")
-            st.stop()
-            
+    # Read each upload once; the same bytes feed the key and the extractors
+    student_bytes = student_file.getvalue()
+    answer_key_bytes = answer_key_file.getvalue()
+    input_key = _input_key(
+        student_file.name.encode(), student_bytes,
+        answer_key_file.name.encode(), answer_key_bytes
+    )
+    # Uploads already parsed on an earlier rerun are read from session_state
+    if st.session_state.get("input_key") == input_key:
         process_ready = True
+    else:
+        with st.spinner("Processing uploaded files..."):
+            # Extract text based on file type
+            student_text = extract_text(student_file.name, student_bytes)
+            answer_key_text = extract_text(answer_key_file.name, answer_key_bytes)
+            
+            if student_text is None or answer_key_text is None:
+                st.error("Unsupported file type")
+                st.stop()
+                
+            process_ready = True
 
 if process_ready:
-    # Check if text was extracted successfully
-    if not student_text or not answer_key_text:
-        st.error("⚠️ Could not extract text. Please check your input.")
-        st.stop()
-    
-    # Parse answers
-    student_answers = split_answers(student_text)
-    correct_answers = split_answers(answer_key_text)
+    if st.session_state.get("input_key") != input_key:
+        # Check if text was extracted successfully
+        if not student_text or not answer_key_text:
+            st.error("⚠️ Could not extract text. Please check your input.")
+            st.stop()
+        
+        # Parse answers
+        student_answers = split_answers(student_text)
+        correct_answers = split_answers(answer_key_text)
+        
+        if not student_answers or not correct_answers:
+            st.error("⚠️ Could not parse questions. Please ensure text uses Q1:, Q2: format.")
+            st.stop()
+        
+        st.session_state.student_answers = student_answers
+        st.session_state.correct_answers = correct_answers
+        st.session_state.input_key = input_key
     
-    if not student_answers or not correct_answers:
-        st.error("⚠️ Could not parse questions. Please ensure text uses Q1:, Q2: format.")
-        st.stop()
+    student_answers = st.session_state.student_answers
+    correct_answers = st.session_state.correct_answers
     
     st.success(f"✅ Found {len(student_answers)} student answers and {len(correct_answers)} correct answers.")
     
@@ -287,72 +460,97 @@ if process_ready:
     
     # Grade all questions
     if st.button("🎯 Grade All Questions", type="primary"):
-        grades = []
-        progress_bar = st.progress(0)
+        student_list = list(student_answers.values())
+        correct_list = [
+            correct_answers.get(q_num, "No answer key provided for this question.")
+            for q_num in student_answers
+        ]
+        # The whole batch is graded in one call, so there is no per-question progress to show
+        with st.spinner("Grading answers..."):
+            results = grade_answers_local(student_list, correct_list)
         
-        for i, (q_num, stu_ans) in enumerate(student_answers.items()):
-            correct_ans = correct_answers.get(q_num, "No answer key provided for this question.")
-            
-            feedback = grade_answer_local(stu_ans, correct_ans, q_num)
-            
+        grades = []
+        for q_num, stu_ans, correct_ans, result in zip(student_answers, student_list, correct_list, results):
             grades.append({
                 "Question": f"Q{q_num}",
+                "Score": result["score"],
+                "Similarity": result["similarity"],
                 "Student Answer": stu_ans,
                 "Correct Answer": correct_ans,
-                "AI Feedback": feedback
+                "AI Feedback": result["feedback"]
             })
-            
-            progress_bar.progress((i + 1) / len(student_answers))
+        
+        # Everything the results view needs is built here, once per grading run:
+        # picking a question reruns the script and should only redraw the details
+        df = pd.DataFrame(grades)
+        scores = df["Score"].to_numpy(dtype=float)
+        st.session_state.results_df = df
+        st.session_state.summary = {
+            "avg_score": float(scores.mean()) if scores.size else 0,
+            "pass_rate": int((scores >= 6).sum()) / scores.size * 100 if scores.size else 0,
+        }
+        st.session_state.graded_key = input_key
+        
+        # Build the downloadable reports once; later reruns reuse the bytes
+        try:
+            st.session_state.reports = {
+                "csv": build_csv_report(df).getvalue(),
+                "xlsx": build_excel_report(df).getvalue() if XLSX_AVAILABLE else None,
+            }
+        except Exception as e:
+            st.session_state.reports = {}
+            st.error(f"Error creating download file: {str(e)}")
+    
+    # Results persist across reruns until the inputs change
+    if st.session_state.get("graded_key") == input_key:
+        df = st.session_state.results_df
+        summary = st.session_state.summary
         
         # Display results
         st.subheader("📊 Grading Results")
-        df = pd.DataFrame(grades)
         
         # Summary statistics
         col1, col2, col3 = st.columns(3)
         with col1:
-            st.metric("Total Questions", len(grades))
+            st.metric("Total Questions", len(df))
         with col2:
-            # Extract scores from feedback
-            scores = []
-            for feedback in df['AI Feedback']:
-                try:
-                    score_line = feedback.split('\n')[0]
-                    score = float(score_line.split('**Score: ')[1].split('/10')[0])
-                    scores.append(score)
-                except:
-                    scores.append(0)
-            avg_score = sum(scores) / len(scores) if scores else 0
-            st.metric("Average Score", f"{avg_score:.1f}/10")
+            st.metric("Average Score", f"{summary['avg_score']:.1f}/10")
         with col3:
-            passing_scores = sum(1 for score in scores if score >= 6)
-            pass_rate = (passing_scores / len(scores) * 100) if scores else 0
-            st.metric("Pass Rate", f"{pass_rate:.1f}%")
+            st.metric("Pass Rate", f"{summary['pass_rate']:.1f}%")
+        
+        # Show all results in one table, with full details for a chosen question
+        st.dataframe(df[["Question", "Score", "AI Feedback"]], hide_index=True)
         
-        # Show results in expandable sections
-        for _, row in df.iterrows():
-            with st.expander(f"📝 {row['Question']}"):
-                col1, col2 = st.columns(2)
-                with col1:
-                    st.write("**Student Answer:**")
-                    st.write(row['Student Answer'])
-                with col2:
-                    st.write("**Correct Answer:**")
-                    st.write(row['Correct Answer'])
-                st.write("**Feedback:**")
-                st.markdown(row['AI Feedback'])
+        selected = st.selectbox(
+            "🔍 Show question details", range(len(df)), format_func=lambda i: df["Question"].iat[i]
+        )
+        row = df.iloc[selected]
+        col1, col2 = st.columns(2)
+        with col1:
+            st.write("**Student Answer:**")
+            st.write(row['Student Answer'])
+        with col2:
+            st.write("**Correct Answer:**")
+            st.write(row['Correct Answer'])
+        st.write("**Feedback:**")
+        st.markdown(row['AI Feedback'])
         
         # Download functionality
-        try:
-            csv_data = df.to_csv(index=False)
+        reports = st.session_state.get("reports", {})
+        if reports.get("csv") is not None:
             st.download_button(
                 label="📥 Download Grading Report (CSV)",
-                data=csv_data,
+                data=reports["csv"],
                 file_name="grading_report.csv",
                 mime="text/csv"
             )
-        except Exception as e:
-            st.error(f"Error creating download file: {str(e)}")
+        if reports.get("xlsx") is not None:
+            st.download_button(
+                label="📥 Download Grading Report (Excel)",
+                data=reports["xlsx"],
+                file_name="grading_report.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            )
 
 else:
     st.info("👈 Please upload files or paste text to begin grading.")
@@ -364,12 +562,14 @@ else:
     - {'✅' if DOCX_AVAILABLE else '❌'} **Word documents** - {'Available' if DOCX_AVAILABLE else 'Install python-docx'}
     - {'✅' if PDF_AVAILABLE else '❌'} **PDF files** - {'Available' if PDF_AVAILABLE else 'Install PyMuPDF'}
     - {'✅' if NLTK_AVAILABLE else '❌'} **Advanced NLP** - {'Available' if NLTK_AVAILABLE else 'Install nltk'}
+    - {'✅' if SKLEARN_AVAILABLE else '❌'} **Vectorized grading** - {'Available' if SKLEARN_AVAILABLE else 'Install scikit-learn'}
+    - {'✅' if XLSX_AVAILABLE else '❌'} **Excel reports** - {'Available' if XLSX_AVAILABLE else 'Install xlsxwriter'}
     
     ### 📄 Instructions:
     1. **Upload files** or **paste text directly** with answers in format: Q1: answer, Q2: answer
     2. **Upload/paste answer key** in the same format
     3. **Click "Grade All Questions"** to get automated feedback
-    4. **Download results** as CSV file
+    4. **Download results** as CSV (or Excel) file
     
     ### 🔧 Required Format:
     ```
@@ -386,5 +586,8 @@ else:
     python-docx
     PyMuPDF
     nltk
+    rapidfuzz>=3.6
+    scikit-learn
+    xlsxwriter
     ```
     """)